@@ -133,12 +133,10 @@ from .const import (  # noqa: F401
 )
 from .modbus import ModbusHub, async_modbus_setup
 from .validators import (
-    duplicate_entity_validator,
+    combined_validator,
     duplicate_fan_mode_validator,
-    duplicate_modbus_validator,
     nan_validator,
     number_validator,
-    scan_interval_validator,
     struct_validator,
 )
 
@@ -417,9 +415,7 @@ CONFIG_SCHEMA = vol.Schema(
     {
         DOMAIN: vol.All(
             cv.ensure_list,
-            scan_interval_validator,
-            duplicate_entity_validator,
-            duplicate_modbus_validator,
+            combined_validator,
             [
                 vol.Any(SERIAL_SCHEMA, ETHERNET_SCHEMA),
             ],
@@ -1,7 +1,8 @@
 """Validate Modbus configuration."""
 from __future__ import annotations
 
-from collections import namedtuple
+from dataclasses import astuple, dataclass
+from functools import lru_cache
 import logging
 import struct
 from typing import Any
@@ -47,110 +48,148 @@ from .const import (
 
 _LOGGER = logging.getLogger(__name__)
 
-ENTRY = namedtuple(
-    "ENTRY",
-    [
-        "struct_id",
-        "register_count",
-        "validate_parm",
-    ],
-)
+# structure strings come from a small set repeated across many entities,
+# so the format parse done by struct.calcsize is worth caching
+_calcsize = lru_cache(maxsize=256)(struct.calcsize)
 
+ILLEGAL = 0
+OPTIONAL = 1
+DEMANDED = 2
+
+
+@dataclass(slots=True, frozen=True)
+class ParmIsLegal:
+    """Rules for the count/structure/slave/swap parameters of a DataType."""
+
+    count: int
+    structure: int
+    slave_count: int
+    swap_byte: int
+    swap_word: int
+
+
+@dataclass(slots=True, frozen=True)
+class Entry:
+    """Describe struct id, register count and parameter rules of a DataType."""
+
+    struct_id: str
+    register_count: int
+    validate_parm: ParmIsLegal
 
-ILLEGAL = "I"
-OPTIONAL = "O"
-DEMANDED = "D"
 
-PARM_IS_LEGAL = namedtuple(
-    "PARM_IS_LEGAL",
-    [
-        "count",
-        "structure",
-        "slave_count",
-        "swap_byte",
-        "swap_word",
-    ],
-)
 DEFAULT_STRUCT_FORMAT = {
-    DataType.INT16: ENTRY(
-        "h", 1, PARM_IS_LEGAL(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, ILLEGAL)
+    DataType.INT16: Entry(
+        "h", 1, ParmIsLegal(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, ILLEGAL)
     ),
-    DataType.UINT16: ENTRY(
-        "H", 1, PARM_IS_LEGAL(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, ILLEGAL)
+    DataType.UINT16: Entry(
+        "H", 1, ParmIsLegal(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, ILLEGAL)
     ),
-    DataType.FLOAT16: ENTRY(
-        "e", 1, PARM_IS_LEGAL(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, ILLEGAL)
+    DataType.FLOAT16: Entry(
+        "e", 1, ParmIsLegal(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, ILLEGAL)
     ),
-    DataType.INT32: ENTRY(
-        "i", 2, PARM_IS_LEGAL(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, OPTIONAL)
+    DataType.INT32: Entry(
+        "i", 2, ParmIsLegal(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, OPTIONAL)
     ),
-    DataType.UINT32: ENTRY(
-        "I", 2, PARM_IS_LEGAL(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, OPTIONAL)
+    DataType.UINT32: Entry(
+        "I", 2, ParmIsLegal(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, OPTIONAL)
     ),
-    DataType.FLOAT32: ENTRY(
-        "f", 2, PARM_IS_LEGAL(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, OPTIONAL)
+    DataType.FLOAT32: Entry(
+        "f", 2, ParmIsLegal(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, OPTIONAL)
     ),
-    DataType.INT64: ENTRY(
-        "q", 4, PARM_IS_LEGAL(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, OPTIONAL)
+    DataType.INT64: Entry(
+        "q", 4, ParmIsLegal(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, OPTIONAL)
     ),
-    DataType.UINT64: ENTRY(
-        "Q", 4, PARM_IS_LEGAL(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, OPTIONAL)
+    DataType.UINT64: Entry(
+        "Q", 4, ParmIsLegal(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, OPTIONAL)
     ),
-    DataType.FLOAT64: ENTRY(
-        "d", 4, PARM_IS_LEGAL(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, OPTIONAL)
+    DataType.FLOAT64: Entry(
+        "d", 4, ParmIsLegal(ILLEGAL, ILLEGAL, OPTIONAL, OPTIONAL, OPTIONAL)
     ),
-    DataType.STRING: ENTRY(
-        "s", 0, PARM_IS_LEGAL(DEMANDED, ILLEGAL, ILLEGAL, OPTIONAL, ILLEGAL)
+    DataType.STRING: Entry(
+        "s", 0, ParmIsLegal(DEMANDED, ILLEGAL, ILLEGAL, OPTIONAL, ILLEGAL)
     ),
-    DataType.CUSTOM: ENTRY(
-        "?", 0, PARM_IS_LEGAL(DEMANDED, DEMANDED, ILLEGAL, ILLEGAL, ILLEGAL)
+    DataType.CUSTOM: Entry(
+        "?", 0, ParmIsLegal(DEMANDED, DEMANDED, ILLEGAL, ILLEGAL, ILLEGAL)
     ),
 }
 
+_DEFAULT_STRUCTURE = {
+    data_type: f">{entry.struct_id}"
+    for data_type, entry in DEFAULT_STRUCT_FORMAT.items()
+}
 
-def struct_validator(config: dict[str, Any]) -> dict[str, Any]:
-    """Sensor schema validator."""
+# validate_parm rules baked into plain tuples, indexed as
+# (count, structure, slave_count, swap_byte, swap_word)
+_VALIDATE_TABLE = {
+    data_type: astuple(entry.validate_parm)
+    for data_type, entry in DEFAULT_STRUCT_FORMAT.items()
+}
 
-    name = config[CONF_NAME]
-    data_type = config[CONF_DATA_TYPE]
-    if data_type == "int":
-        data_type = config[CONF_DATA_TYPE] = DataType.INT16
-    count = config.get(CONF_COUNT, None)
-    structure = config.get(CONF_STRUCTURE, None)
-    slave_count = config.get(CONF_SLAVE_COUNT, config.get(CONF_VIRTUAL_COUNT))
-    validator = DEFAULT_STRUCT_FORMAT[data_type].validate_parm
-    swap_type = config.get(CONF_SWAP)
-    for entry in (
-        (count, validator.count, CONF_COUNT),
-        (structure, validator.structure, CONF_STRUCTURE),
-        (
-            slave_count,
-            validator.slave_count,
-            f"{CONF_VIRTUAL_COUNT} / {CONF_SLAVE_COUNT}",
-        ),
-    ):
-        if entry[0] is None:
-            if entry[1] == DEMANDED:
-                error = f"{name}: `{entry[2]}:` missing, demanded with `{CONF_DATA_TYPE}: {data_type}`"
-                raise vol.Invalid(error)
-        elif entry[1] == ILLEGAL:
+# swap type -> index of its rule in the _VALIDATE_TABLE tuples
+_SWAP_RULE_INDEX = {
+    CONF_SWAP_BYTE: 3,
+    CONF_SWAP_WORD: 4,
+    CONF_SWAP_WORD_BYTE: 4,
+}
+
+
+@lru_cache(maxsize=1024)
+def _struct_validator_impl(
+    name: str,
+    data_type: DataType,
+    count: int | None,
+    structure: str | None,
+    slave_count: int | None,
+    swap_type: str | None,
+) -> tuple[str | None, int | None]:
+    """Check one (data_type, count, structure, slave_count, swap_type) shape.
+
+    The shape signatures repeat across entities and reloads, so the result
+    (derived structure and count override) is memoized; invalid shapes raise
+    vol.Invalid and are not cached.
+    """
+    validator = _VALIDATE_TABLE[data_type]
+    if count is None:
+        if validator[0] == DEMANDED:
+            error = f"{name}: `{CONF_COUNT}:` missing, demanded with `{CONF_DATA_TYPE}: {data_type}`"
+            raise vol.Invalid(error)
+    elif validator[0] == ILLEGAL:
+        error = f"{name}: `{CONF_COUNT}:` illegal with `{CONF_DATA_TYPE}: {data_type}`"
+        raise vol.Invalid(error)
+    if structure is None:
+        if validator[1] == DEMANDED:
+            error = f"{name}: `{CONF_STRUCTURE}:` missing, demanded with `{CONF_DATA_TYPE}: {data_type}`"
+            raise vol.Invalid(error)
+    elif validator[1] == ILLEGAL:
+        error = (
+            f"{name}: `{CONF_STRUCTURE}:` illegal with `{CONF_DATA_TYPE}: {data_type}`"
+        )
+        raise vol.Invalid(error)
+    if slave_count is None:
+        if validator[2] == DEMANDED:
             error = (
-                f"{name}: `{entry[2]}:` illegal with `{CONF_DATA_TYPE}: {data_type}`"
+                f"{name}: `{CONF_VIRTUAL_COUNT} / {CONF_SLAVE_COUNT}:` missing, "
+                f"demanded with `{CONF_DATA_TYPE}: {data_type}`"
             )
             raise vol.Invalid(error)
+    elif validator[2] == ILLEGAL:
+        error = (
+            f"{name}: `{CONF_VIRTUAL_COUNT} / {CONF_SLAVE_COUNT}:` illegal "
+            f"with `{CONF_DATA_TYPE}: {data_type}`"
+        )
+        raise vol.Invalid(error)
 
     if swap_type:
-        swap_type_validator = {
-            CONF_SWAP_BYTE: validator.swap_byte,
-            CONF_SWAP_WORD: validator.swap_word,
-            CONF_SWAP_WORD_BYTE: validator.swap_word,
-        }[swap_type]
+        swap_type_validator = validator[_SWAP_RULE_INDEX[swap_type]]
         if swap_type_validator == ILLEGAL:
             error = f"{name}: `{CONF_SWAP}:{swap_type}` illegal with `{CONF_DATA_TYPE}: {data_type}`"
             raise vol.Invalid(error)
-    if config[CONF_DATA_TYPE] == DataType.CUSTOM:
+    if data_type == DataType.CUSTOM:
+        # count and structure are DEMANDED for CUSTOM, checked above
+        assert count is not None
+        assert structure is not None
         try:
-            size = struct.calcsize(structure)
+            size = _calcsize(structure)
         except struct.error as err:
             raise vol.Invalid(
                 f"{name}: error in structure format --> {str(err)}"
@@ -160,15 +199,34 @@ def struct_validator(config: dict[str, Any]) -> dict[str, Any]:
             raise vol.Invalid(
                 f"{name}: Size of structure is {size} bytes but `{CONF_COUNT}: {count}` is {bytecount} bytes"
             )
+        return structure, None
+    entry_def = DEFAULT_STRUCT_FORMAT[data_type]
+    if slave_count:
+        structure = f">{slave_count + 1}{entry_def.struct_id}"
     else:
-        if data_type != DataType.STRING:
-            config[CONF_COUNT] = DEFAULT_STRUCT_FORMAT[data_type].register_count
-        if slave_count:
-            structure = (
-                f">{slave_count + 1}{DEFAULT_STRUCT_FORMAT[data_type].struct_id}"
-            )
-        else:
-            structure = f">{DEFAULT_STRUCT_FORMAT[data_type].struct_id}"
+        structure = _DEFAULT_STRUCTURE[data_type]
+    if data_type != DataType.STRING:
+        return structure, entry_def.register_count
+    return structure, None
+
+
+def struct_validator(config: dict[str, Any]) -> dict[str, Any]:
+    """Sensor schema validator."""
+
+    data_type = config[CONF_DATA_TYPE]
+    if data_type == "int":
+        data_type = config[CONF_DATA_TYPE] = DataType.INT16
+    swap_type = config.get(CONF_SWAP)
+    structure, count_override = _struct_validator_impl(
+        config[CONF_NAME],
+        data_type,
+        config.get(CONF_COUNT, None),
+        config.get(CONF_STRUCTURE, None),
+        config.get(CONF_SLAVE_COUNT, config.get(CONF_VIRTUAL_COUNT)),
+        swap_type,
+    )
+    if count_override is not None:
+        config[CONF_COUNT] = count_override
     return {
         **config,
         CONF_STRUCTURE: structure,
@@ -183,6 +241,13 @@ def number_validator(value: Any) -> int | float:
     if isinstance(value, float):
         return value
 
+    if isinstance(value, str) and ("." in value or "e" in value or "E" in value):
+        # obvious float string: go straight to float() instead of paying
+        # for the int() exception first
+        try:
+            return float(value)
+        except (TypeError, ValueError) as err:
+            raise vol.Invalid(f"invalid number {value}") from err
     try:
         return int(value)
     except (TypeError, ValueError):
@@ -207,149 +272,175 @@ def nan_validator(value: Any) -> int:
         raise vol.Invalid(f"invalid number {value}") from err
 
 
-def scan_interval_validator(config: dict) -> dict:
-    """Control scan_interval."""
-    for hub in config:
-        minimum_scan_interval = DEFAULT_SCAN_INTERVAL
-        for component, conf_key in PLATFORMS:
-            if conf_key not in hub:
-                continue
+def combined_validator(config: list) -> list:
+    """Check scan_interval and duplicates (hubs and entities) in one pass.
 
-            for entry in hub[conf_key]:
-                scan_interval = entry.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
-                if scan_interval == 0:
-                    continue
-                if scan_interval < 5:
-                    _LOGGER.warning(
-                        (
-                            "%s %s scan_interval(%d) is lower than 5 seconds, "
-                            "which may cause Home Assistant stability issues"
-                        ),
-                        component,
-                        entry.get(CONF_NAME),
-                        scan_interval,
-                    )
-                entry[CONF_SCAN_INTERVAL] = scan_interval
-                minimum_scan_interval = min(scan_interval, minimum_scan_interval)
-        if (
-            CONF_TIMEOUT in hub
-            and hub[CONF_TIMEOUT] > minimum_scan_interval - 1
-            and minimum_scan_interval > 1
-        ):
+    The hub list and the per-platform entity lists are only walked once,
+    doing scan_interval control and duplicate detection in the same loop.
+    """
+    platforms = PLATFORMS
+    hosts: set[str] = set()
+    hub_names: set[str] = set()
+    filtered_hubs: list = []
+    for hub in config:
+        hub_get = hub.get
+        hub_name = hub_get(CONF_NAME, DEFAULT_HUB)
+        if hub[CONF_TYPE] == SERIAL:
+            host = hub[CONF_PORT]
+        else:
+            host = f"{hub[CONF_HOST]}_{hub[CONF_PORT]}"
+        if host in hosts:
             _LOGGER.warning(
-                "Modbus %s timeout(%d) is adjusted(%d) due to scan_interval",
-                hub.get(CONF_NAME, ""),
-                hub[CONF_TIMEOUT],
-                minimum_scan_interval - 1,
+                "Modbus %s contains duplicate host/port %s, not loaded!",
+                hub_name,
+                host,
             )
-            hub[CONF_TIMEOUT] = minimum_scan_interval - 1
-    return config
+            continue
+        if hub_name in hub_names:
+            _LOGGER.warning(
+                "Modbus %s is duplicate, second entry not loaded!", hub_name
+            )
+            continue
+        hosts.add(host)
+        hub_names.add(hub_name)
+        filtered_hubs.append(hub)
 
+        minimum_scan_interval = DEFAULT_SCAN_INTERVAL
+        active_platforms = [
+            (component, conf_key)
+            for component, conf_key in platforms
+            if conf_key in hub
+        ]
+        for component, conf_key in active_platforms:
+            entries = hub[conf_key]
+            # a single entry cannot clash, so duplicate detection (and its
+            # set bookkeeping) is only needed for 2 or more entries
+            check_duplicates = len(entries) > 1
+            if check_duplicates:
+                names: set[str] = set()
+                errors: list[int] = []
+                addresses: set[tuple] = set()
+            for index, entry in enumerate(entries):
+                entry_get = entry.get
+                scan_interval = entry_get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+                if scan_interval != 0:
+                    if scan_interval < 5:
+                        _LOGGER.warning(
+                            (
+                                "%s %s scan_interval(%d) is lower than 5 seconds, "
+                                "which may cause Home Assistant stability issues"
+                            ),
+                            component,
+                            entry_get(CONF_NAME),
+                            scan_interval,
+                        )
+                    entry[CONF_SCAN_INTERVAL] = scan_interval
+                    minimum_scan_interval = min(scan_interval, minimum_scan_interval)
 
-def duplicate_entity_validator(config: dict) -> dict:
-    """Control scan_interval."""
-    for hub_index, hub in enumerate(config):
-        for component, conf_key in PLATFORMS:
-            if conf_key not in hub:
-                continue
-            names: set[str] = set()
-            errors: list[int] = []
-            addresses: set[str] = set()
-            for index, entry in enumerate(hub[conf_key]):
+                if not check_duplicates:
+                    continue
                 name = entry[CONF_NAME]
-                addr = str(entry[CONF_ADDRESS])
-                if CONF_INPUT_TYPE in entry:
-                    addr += "_" + str(entry[CONF_INPUT_TYPE])
-                elif CONF_WRITE_TYPE in entry:
-                    addr += "_" + str(entry[CONF_WRITE_TYPE])
-                if CONF_COMMAND_ON in entry:
-                    addr += "_" + str(entry[CONF_COMMAND_ON])
-                if CONF_COMMAND_OFF in entry:
-                    addr += "_" + str(entry[CONF_COMMAND_OFF])
-                inx = entry.get(CONF_SLAVE, None) or entry.get(CONF_DEVICE_ADDRESS, 0)
-                addr += "_" + str(inx)
-                entry_addrs: set[str] = set()
+                inx = entry_get(CONF_SLAVE, None) or entry_get(CONF_DEVICE_ADDRESS, 0)
+                # composite keys are tuples of the raw values, holding only
+                # the fields present on the entry in the same order the old
+                # "_"-joined strings concatenated them, so exactly the same
+                # entries collide
+                addr_parts = [entry[CONF_ADDRESS]]
+                io_type = entry_get(CONF_INPUT_TYPE, entry_get(CONF_WRITE_TYPE))
+                if io_type is not None:
+                    addr_parts.append(io_type)
+                if (command_on := entry_get(CONF_COMMAND_ON)) is not None:
+                    addr_parts.append(command_on)
+                if (command_off := entry_get(CONF_COMMAND_OFF)) is not None:
+                    addr_parts.append(command_off)
+                addr_parts.append(inx)
+                addr = tuple(addr_parts)
+                entry_addrs: set[tuple] = set()
                 entry_addrs.add(addr)
 
-                if CONF_TARGET_TEMP in entry:
-                    a = str(entry[CONF_TARGET_TEMP])
-                    a += "_" + str(inx)
-                    entry_addrs.add(a)
-                if CONF_HVAC_MODE_REGISTER in entry:
-                    a = str(entry[CONF_HVAC_MODE_REGISTER][CONF_ADDRESS])
-                    a += "_" + str(inx)
-                    entry_addrs.add(a)
-                if CONF_FAN_MODE_REGISTER in entry:
-                    a = str(entry[CONF_FAN_MODE_REGISTER][CONF_ADDRESS])
-                    a += "_" + str(inx)
-                    entry_addrs.add(a)
-
-                dup_addrs = entry_addrs.intersection(addresses)
+                if (target_temp := entry_get(CONF_TARGET_TEMP)) is not None:
+                    entry_addrs.add((target_temp, inx))
+                if (hvac_reg := entry_get(CONF_HVAC_MODE_REGISTER)) is not None:
+                    entry_addrs.add((hvac_reg[CONF_ADDRESS], inx))
+                if (fan_reg := entry_get(CONF_FAN_MODE_REGISTER)) is not None:
+                    entry_addrs.add((fan_reg[CONF_ADDRESS], inx))
+
+                if len(entry_addrs) == 1:
+                    # common non-climate case: adding and comparing the set
+                    # size does the membership test and the insert in a
+                    # single hash pass
+                    prev_len = len(addresses)
+                    addresses.add(addr)
+                    dup_addrs = entry_addrs if len(addresses) == prev_len else ()
+                else:
+                    dup_addrs = entry_addrs.intersection(addresses)
+                    if not dup_addrs:
+                        addresses |= entry_addrs
 
                 if len(dup_addrs) > 0:
                     for addr in dup_addrs:
-                        err = (
-                            f"Modbus {component}/{name} address {addr} is duplicate, second"
-                            " entry not loaded!"
+                        _LOGGER.warning(
+                            (
+                                "Modbus %s/%s address %s is duplicate, second"
+                                " entry not loaded!"
+                            ),
+                            component,
+                            name,
+                            "_".join(map(str, addr)),
                         )
-                        _LOGGER.warning(err)
-                    errors.append(index)
-                elif name in names:
-                    err = (
-                        f"Modbus {component}/{name}  is duplicate, second entry not"
-                        " loaded!"
-                    )
-                    _LOGGER.warning(err)
                     errors.append(index)
                 else:
+                    prev_len = len(names)
                     names.add(name)
-                    addresses.update(entry_addrs)
-
-            for i in reversed(errors):
-                del config[hub_index][conf_key][i]
-    return config
+                    if len(names) == prev_len:
+                        _LOGGER.warning(
+                            "Modbus %s/%s  is duplicate, second entry not loaded!",
+                            component,
+                            name,
+                        )
+                        errors.append(index)
+                        # the entry is dropped, so its keys must not block
+                        # later entries
+                        addresses -= entry_addrs
 
+            if check_duplicates:
+                for i in reversed(errors):
+                    del entries[i]
 
-def duplicate_modbus_validator(config: list) -> list:
-    """Control modbus connection for duplicates."""
-    hosts: set[str] = set()
-    names: set[str] = set()
-    errors = []
-    for index, hub in enumerate(config):
-        name = hub.get(CONF_NAME, DEFAULT_HUB)
-        if hub[CONF_TYPE] == SERIAL:
-            host = hub[CONF_PORT]
-        else:
-            host = f"{hub[CONF_HOST]}_{hub[CONF_PORT]}"
-        if host in hosts:
-            err = f"Modbus {name} contains duplicate host/port {host}, not loaded!"
-            _LOGGER.warning(err)
-            errors.append(index)
-        elif name in names:
-            err = f"Modbus {name} is duplicate, second entry not loaded!"
-            _LOGGER.warning(err)
-            errors.append(index)
-        else:
-            hosts.add(host)
-            names.add(name)
+        if (
+            CONF_TIMEOUT in hub
+            and hub[CONF_TIMEOUT] > minimum_scan_interval - 1
+            and minimum_scan_interval > 1
+        ):
+            _LOGGER.warning(
+                "Modbus %s timeout(%d) is adjusted(%d) due to scan_interval",
+                hub_get(CONF_NAME, ""),
+                hub[CONF_TIMEOUT],
+                minimum_scan_interval - 1,
+            )
+            hub[CONF_TIMEOUT] = minimum_scan_interval - 1
 
-    for i in reversed(errors):
-        del config[i]
+    config[:] = filtered_hubs
     return config
 
 
 def duplicate_fan_mode_validator(config: dict[str, Any]) -> dict:
     """Control modbus climate fan mode values for duplicates."""
     fan_modes: set[int] = set()
-    errors = []
+    deduped: dict[str, int] = {}
     for key, value in config[CONF_FAN_MODE_VALUES].items():
         if value in fan_modes:
-            wrn = f"Modbus fan mode {key} has a duplicate value {value}, not loaded, values must be unique!"
-            _LOGGER.warning(wrn)
-            errors.append(key)
-        else:
-            fan_modes.add(value)
+            _LOGGER.warning(
+                (
+                    "Modbus fan mode %s has a duplicate value %s, "
+                    "not loaded, values must be unique!"
+                ),
+                key,
+                value,
+            )
+            continue
+        fan_modes.add(value)
+        deduped[key] = value
 
-    for key in reversed(errors):
-        del config[CONF_FAN_MODE_VALUES][key]
+    config[CONF_FAN_MODE_VALUES] = deduped
     return config
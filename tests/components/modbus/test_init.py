@@ -78,9 +78,8 @@ from homeassistant.components.modbus.const import (
     DataType,
 )
 from homeassistant.components.modbus.validators import (
-    duplicate_entity_validator,
+    combined_validator,
     duplicate_fan_mode_validator,
-    duplicate_modbus_validator,
     nan_validator,
     number_validator,
     struct_validator,
@@ -90,6 +89,8 @@ from homeassistant.const import (
     ATTR_STATE,
     CONF_ADDRESS,
     CONF_BINARY_SENSORS,
+    CONF_COMMAND_OFF,
+    CONF_COMMAND_ON,
     CONF_COUNT,
     CONF_DELAY,
     CONF_HOST,
@@ -100,6 +101,7 @@ from homeassistant.const import (
     CONF_SENSORS,
     CONF_SLAVE,
     CONF_STRUCTURE,
+    CONF_SWITCHES,
     CONF_TIMEOUT,
     CONF_TYPE,
     EVENT_HOMEASSISTANT_STOP,
@@ -369,7 +371,7 @@ async def test_exception_struct_validator(do_config) -> None:
 )
 async def test_duplicate_modbus_validator(do_config) -> None:
     """Test duplicate modbus validator."""
-    duplicate_modbus_validator(do_config)
+    combined_validator(do_config)
     assert len(do_config) == 1
 
 
@@ -455,15 +457,39 @@ async def test_duplicate_fan_mode_validator(do_config) -> None:
                 ],
             }
         ],
+        [
+            {
+                CONF_NAME: TEST_MODBUS_NAME,
+                CONF_TYPE: TCP,
+                CONF_HOST: TEST_MODBUS_HOST,
+                CONF_PORT: TEST_PORT_TCP,
+                CONF_SWITCHES: [
+                    {
+                        CONF_NAME: TEST_ENTITY_NAME,
+                        CONF_ADDRESS: 117,
+                        CONF_COMMAND_ON: 1,
+                        CONF_SLAVE: 0,
+                    },
+                    {
+                        CONF_NAME: TEST_ENTITY_NAME + " 2",
+                        CONF_ADDRESS: 117,
+                        CONF_COMMAND_OFF: 1,
+                        CONF_SLAVE: 0,
+                    },
+                ],
+            }
+        ],
     ],
 )
 async def test_duplicate_entity_validator(do_config) -> None:
     """Test duplicate entity validator."""
-    duplicate_entity_validator(do_config)
+    combined_validator(do_config)
     if CONF_SENSORS in do_config[0]:
         assert len(do_config[0][CONF_SENSORS]) == 1
     elif CONF_CLIMATES in do_config[0]:
         assert len(do_config[0][CONF_CLIMATES]) == 1
+    elif CONF_SWITCHES in do_config[0]:
+        assert len(do_config[0][CONF_SWITCHES]) == 1
 
 
 @pytest.mark.parametrize(
@@ -597,7 +623,7 @@ async def test_duplicate_entity_validator(do_config) -> None:
 )
 async def test_duplicate_entity_validator_with_climate(do_config) -> None:
     """Test duplicate entity validator."""
-    duplicate_entity_validator(do_config)
+    combined_validator(do_config)
     assert len(do_config[0][CONF_CLIMATES]) == 1
 
 